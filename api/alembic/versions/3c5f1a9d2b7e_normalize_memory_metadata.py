@@ -0,0 +1,46 @@
+"""normalize_memory_metadata
+
+Revision ID: 3c5f1a9d2b7e
+Revises: afd00efbd06b
+Create Date: 2026-10-15 09:12:40.118305
+
+"""
+import json
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '3c5f1a9d2b7e'
+down_revision: Union[str, None] = 'afd00efbd06b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Older rows may hold metadata as a JSON-encoded string instead of an object.
+    # Decode them once so readers can rely on memories.metadata being a dict.
+    conn = op.get_bind()
+    rows = conn.execute(sa.text(
+        "SELECT id, metadata #>> '{}' FROM memories WHERE json_typeof(metadata) = 'string'"
+    )).fetchall()
+
+    for memory_id, raw in rows:
+        try:
+            metadata = json.loads(raw)
+        except (TypeError, ValueError):
+            metadata = {}
+        if not isinstance(metadata, dict):
+            metadata = {}
+        conn.execute(
+            sa.text("UPDATE memories SET metadata = CAST(:metadata AS json) WHERE id = :id"),
+            {"metadata": json.dumps(metadata), "id": memory_id},
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Data-only migration; decoded metadata is left as-is.
+    pass
@@ -0,0 +1,40 @@
+"""add_memory_list_and_search_indexes
+
+Revision ID: 8e21d4c07a95
+Revises: 3c5f1a9d2b7e
+Create Date: 2026-10-15 10:03:17.524911
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '8e21d4c07a95'
+down_revision: Union[str, None] = '3c5f1a9d2b7e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Newest-first listing per user becomes an index range scan instead of scan + sort
+    op.create_index(
+        'idx_memory_user_created', 'memories',
+        ['user_id', sa.text('created_at DESC')], unique=False
+    )
+
+    # Trigram index so ILIKE '%...%' content searches can avoid a full table scan
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'idx_memory_content_trgm', 'memories', ['content'], unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'content': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_memory_content_trgm', table_name='memories')
+    op.drop_index('idx_memory_user_created', table_name='memories')
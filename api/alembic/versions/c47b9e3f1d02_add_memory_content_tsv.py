@@ -0,0 +1,36 @@
+"""add_memory_content_tsv
+
+Revision ID: c47b9e3f1d02
+Revises: 8e21d4c07a95
+Create Date: 2026-10-15 11:26:52.907433
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c47b9e3f1d02'
+down_revision: Union[str, None] = '8e21d4c07a95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # IF NOT EXISTS: migrations/add_memory_content_tsv.py may already have
+    # added these at container startup
+    op.execute(
+        "ALTER TABLE memories ADD COLUMN IF NOT EXISTS content_tsv tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('simple', content)) STORED"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_memory_content_tsv "
+        "ON memories USING gin (content_tsv)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_memory_content_tsv', table_name='memories')
+    op.drop_column('memories', 'content_tsv')
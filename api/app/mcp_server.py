@@ -6,14 +6,17 @@ import logging
 import asyncio
 import time
 from datetime import datetime, timezone
-from typing import Optional, AsyncGenerator, Dict, Any, List
+from typing import Optional, AsyncGenerator, Dict, Any, List, Set, Tuple
 from uuid import uuid4
-import traceback
-from collections import defaultdict
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 
-from fastapi import FastAPI, HTTPException, Query, Request, BackgroundTasks
+import orjson
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
 from app.auth import get_or_create_user_with_api_key, validate_api_key
@@ -24,9 +27,131 @@ from app.utils.memory import get_memory_client
 
 logger = logging.getLogger(__name__)
 
+class MessageQueue:
+    """Single-consumer queue for SSE sessions, lighter than asyncio.Queue"""
+    __slots__ = ("_items", "_ready")
+    
+    def __init__(self):
+        self._items = deque()
+        self._ready = asyncio.Event()
+    
+    def put(self, item: Any) -> None:
+        self._items.append(item)
+        self._ready.set()
+    
+    async def get(self) -> Any:
+        while not self._items:
+            self._ready.clear()
+            await self._ready.wait()
+        return self._items.popleft()
+    
+    def drain(self) -> List[Any]:
+        """Remove and return everything currently queued without waiting"""
+        items = list(self._items)
+        self._items.clear()
+        return items
+
+
 # Store active SSE sessions with their message queues
 sse_sessions: Dict[str, Dict[str, Any]] = {}
 
+# SSE framing, pre-encoded so the stream is bytes end to end
+_KEEPALIVE = b": keepalive\n\n"
+_SSE_ENDPOINT_PREFIX = b"event: endpoint\ndata: "
+_SSE_DATA_PREFIX = b"data: "
+_SSE_FRAME_END = b"\n\n"
+
+# Sessions not seen for this long (10 missed keepalives) are reaped
+SSE_SESSION_TTL = 300.0
+SSE_REAP_INTERVAL = 60.0
+_session_reaper: Optional[asyncio.Task] = None
+
+# Cache user UUID -> (default app UUID, expiry) so reconnects skip the App lookup
+DEFAULT_APP_CACHE_TTL = 300.0
+_default_app_cache: Dict[Any, Tuple[Any, float]] = {}
+# One lock per user, so cold connects for different users do not queue behind each other
+_default_app_locks: Dict[Any, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+# Vector store adds run mem0 fact extraction and embedding (seconds each), so they
+# get their own bounded pool instead of starving the default executor that serves
+# the short DB calls on the request path
+VECTOR_STORE_WORKERS = 4
+_vector_store_executor = ThreadPoolExecutor(
+    max_workers=VECTOR_STORE_WORKERS, thread_name_prefix="vector-store"
+)
+# Strong references to in-flight vector store writes so they are not garbage collected
+_vector_store_tasks: Set[asyncio.Future] = set()
+
+
+async def _reap_stale_sessions() -> None:
+    """Drop SSE sessions whose stream ended without running its own cleanup"""
+    while True:
+        await asyncio.sleep(SSE_REAP_INTERVAL)
+        cutoff = time.monotonic() - SSE_SESSION_TTL
+        stale = [sid for sid, session in sse_sessions.items() if session["last_seen"] < cutoff]
+        for sid in stale:
+            sse_sessions.pop(sid, None)
+            logger.info(f"SSE session reaped: {sid}")
+
+
+def _ensure_session_reaper() -> None:
+    """Start the stale-session reaper on the running loop if it is not already active"""
+    global _session_reaper
+    if _session_reaper is None or _session_reaper.done():
+        _session_reaper = asyncio.create_task(_reap_stale_sessions())
+
+
+def _authenticate_api_key(api_key: str) -> Optional[Tuple[Any, str]]:
+    """Validate an API key and return (user UUID, user_id string); runs in a worker thread"""
+    db = SessionLocal()
+    try:
+        user = validate_api_key(api_key, db)
+        if not user:
+            return None
+        return user.id, user.user_id
+    finally:
+        db.close()
+
+
+def _load_default_app_id(user_uuid: Any) -> Any:
+    """Get or create the user's default app in one statement and return its UUID; runs in a worker thread"""
+    db = SessionLocal()
+    try:
+        stmt = pg_insert(App).values(owner_id=user_uuid, name="default", is_active=True)
+        # No-op update on conflict so RETURNING also yields an existing app, unchanged
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[App.owner_id, App.name],
+            set_={"name": stmt.excluded.name},
+        ).returning(App.id)
+        app_uuid = db.execute(stmt).scalar_one()
+        db.commit()
+        return app_uuid
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+async def _get_or_create_default_app(user_uuid: Any) -> Any:
+    """Return the UUID of the user's default app, creating the app if needed"""
+    cached = _default_app_cache.get(user_uuid)
+    if cached and cached[1] > time.monotonic():
+        return cached[0]
+    
+    async with _default_app_locks[user_uuid]:
+        # Another connection may have populated the cache while we waited
+        cached = _default_app_cache.get(user_uuid)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+        
+        # No invalidation needed: apps are only ever soft-deleted (is_active=False),
+        # so a cached id always refers to an existing row
+        app_uuid = await asyncio.to_thread(_load_default_app_id, user_uuid)
+        
+        _default_app_cache[user_uuid] = (app_uuid, time.monotonic() + DEFAULT_APP_CACHE_TTL)
+        return app_uuid
+
 
 def setup_mcp_server(app: FastAPI):
     """Setup MCP (Model Context Protocol) server endpoints with proper SSE transport"""
@@ -35,7 +160,6 @@ def setup_mcp_server(app: FastAPI):
     async def mcp_sse_endpoint(
         client: str,
         request: Request,
-        background_tasks: BackgroundTasks,
         api_key: Optional[str] = Query(None, alias="key")
     ):
         """SSE endpoint for MCP clients - supergateway compatible"""
@@ -51,87 +175,69 @@ def setup_mcp_server(app: FastAPI):
         if not api_key:
             raise HTTPException(status_code=401, detail="API key required")
         
-        # Validate API key and get UUIDs
-        db = SessionLocal()
-        try:
-            user = validate_api_key(api_key, db)
-            if not user:
-                raise HTTPException(status_code=401, detail="Invalid API key")
-            
-            user_uuid = user.id  # Use UUID primary key
-            user_id_str = user.user_id  # Keep string for logging
-            
-            # Get or create default app for this user
-            app = db.query(App).filter_by(owner_id=user_uuid, name="default").first()
-            if not app:
-                app = App(
-                    name="default",
-                    owner_id=user_uuid,
-                    is_active=True
-                )
-                db.add(app)
-                db.commit()
-                db.refresh(app)
-            
-            app_uuid = app.id
-            
-        finally:
-            db.close()
+        # Validate API key and get UUIDs (UUID primary key, string user_id for logging)
+        user_ids = await asyncio.to_thread(_authenticate_api_key, api_key)
+        if not user_ids:
+            raise HTTPException(status_code=401, detail="Invalid API key")
+        user_uuid, user_id_str = user_ids
+        
+        # Get or create default app for this user
+        app_uuid = await _get_or_create_default_app(user_uuid)
         
         # Create session
         session_id = str(uuid4())
-        message_queue = asyncio.Queue()
+        message_queue = MessageQueue()
         
-        sse_sessions[session_id] = {
+        session = sse_sessions[session_id] = {
             "user_uuid": user_uuid,      # For database operations
             "user_id_str": user_id_str,  # For vector store operations  
             "app_uuid": app_uuid,
             "client": client,
-            "queue": message_queue
+            "queue": message_queue,
+            "last_seen": time.monotonic()
         }
+        _ensure_session_reaper()
         
         logger.info(f"SSE session created: {session_id} for user: {user_id_str}, client: {client}")
         
-        async def cleanup():
-            """Clean up session on disconnect"""
-            await asyncio.sleep(1)  # Give time for final messages
-            if session_id in sse_sessions:
-                del sse_sessions[session_id]
-                logger.info(f"SSE session cleaned up: {session_id}")
-        
-        background_tasks.add_task(cleanup)
-        
-        async def event_generator() -> AsyncGenerator[str, None]:
+        async def event_generator() -> AsyncGenerator[bytes, None]:
             """Generate SSE events for supergateway"""
             try:
                 # CRITICAL: Send the endpoint event first
                 # This tells supergateway where to POST messages
                 endpoint_path = f"/mcp/{client}/messages/{session_id}"
-                yield f"event: endpoint\ndata: {endpoint_path}\n\n"
+                yield _SSE_ENDPOINT_PREFIX + endpoint_path.encode() + _SSE_FRAME_END
                 
                 logger.info(f"Sent endpoint event: {endpoint_path}")
                 
                 # Now wait for messages from the queue
                 while True:
                     try:
-                        if await request.is_disconnected():
-                            logger.info(f"Client disconnected: {session_id}")
-                            break
-                        
                         # Wait for messages with timeout for heartbeat
                         try:
                             message = await asyncio.wait_for(
                                 message_queue.get(), 
                                 timeout=30.0
                             )
-                            # Send message as SSE data
-                            yield f"data: {json.dumps(message)}\n\n"
-                            logger.debug(f"Sent message via SSE: {message.get('method', message.get('id'))}")
+                            # Flush anything else already queued in the same write
+                            messages = [message]
+                            messages.extend(message_queue.drain())
+                            
+                            # Send messages as SSE data
+                            yield b"".join(
+                                _SSE_DATA_PREFIX + orjson.dumps(m) + _SSE_FRAME_END for m in messages
+                            )
+                            logger.debug(f"Sent {len(messages)} message(s) via SSE")
                         except asyncio.TimeoutError:
                             # Send heartbeat comment
-                            yield ": keepalive\n\n"
+                            yield _KEEPALIVE
+                        
+                        # The write went through, so the stream is still alive
+                        session["last_seen"] = time.monotonic()
                             
                     except asyncio.CancelledError:
+                        # Starlette cancels the stream when the client disconnects
+                        logger.info(f"Client disconnected: {session_id}")
                         break
                     except Exception as e:
                         logger.error(f"Error in event generator: {e}")
@@ -139,6 +245,10 @@ def setup_mcp_server(app: FastAPI):
                         
             except Exception as e:
                 logger.error(f"Critical error in SSE generator: {e}")
+            finally:
+                # Drop the session as soon as the stream ends
+                sse_sessions.pop(session_id, None)
+                logger.info(f"SSE session cleaned up: {session_id}")
         
         return StreamingResponse(
             event_generator(),
@@ -176,9 +286,14 @@ def setup_mcp_server(app: FastAPI):
         
         try:
             # Get the JSON-RPC request
-            rpc_request = await request.json()
+            rpc_request = orjson.loads(await request.body())
             logger.info(f"Received message: {rpc_request.get('method')} (id: {rpc_request.get('id')})")
             
+            # Notifications (no id) never get a JSON-RPC response, so skip
+            # processing and the SSE round-trip entirely
+            if "id" not in rpc_request:
+                return {"ok": True}
+            
             # Process the request
             method = rpc_request.get("method")
             params = rpc_request.get("params", {})
@@ -190,14 +305,13 @@ def setup_mcp_server(app: FastAPI):
             )
             
             # Queue the response to be sent via SSE
-            await session["queue"].put(response)
+            session["queue"].put(response)
             
             # Return empty response (actual response goes via SSE)
             return {"ok": True}
             
         except Exception as e:
-            logger.error(f"Error processing message: {e}")
-            logger.error(traceback.format_exc())
+            logger.exception("Error processing message: %s", e)
             error_response = {
                 "jsonrpc": "2.0",
                 "id": rpc_request.get("id") if 'rpc_request' in locals() else None,
@@ -207,7 +321,7 @@ def setup_mcp_server(app: FastAPI):
                     "data": str(e)
                 }
             }
-            await session["queue"].put(error_response)
+            session["queue"].put(error_response)
             return {"ok": True}
     
     # Keep the existing RPC endpoint for direct testing
@@ -233,42 +347,24 @@ def setup_mcp_server(app: FastAPI):
                 }
             }
         
-        db = SessionLocal()
-        try:
-            user = validate_api_key(api_key, db)
-            if not user:
-                return {
-                    "jsonrpc": "2.0",
-                    "id": None,
-                    "error": {
-                        "code": -32700,
-                        "message": "Invalid API key"
-                    }
+        user_ids = await asyncio.to_thread(_authenticate_api_key, api_key)
+        if not user_ids:
+            return {
+                "jsonrpc": "2.0",
+                "id": None,
+                "error": {
+                    "code": -32700,
+                    "message": "Invalid API key"
                 }
-            
-            user_uuid = user.id  # Use UUID primary key
-            user_id_str = user.user_id  # Keep string for logging
-            
-            # Get or create default app for this user
-            app = db.query(App).filter_by(owner_id=user_uuid, name="default").first()
-            if not app:
-                app = App(
-                    name="default",
-                    owner_id=user_uuid,
-                    is_active=True
-                )
-                db.add(app)
-                db.commit()
-                db.refresh(app)
-            
-            app_uuid = app.id
-            
-        finally:
-            db.close()
+            }
+        user_uuid, user_id_str = user_ids
+        
+        # Get or create default app for this user
+        app_uuid = await _get_or_create_default_app(user_uuid)
         
         # Parse JSON-RPC request
         try:
-            rpc_request = await request.json()
+            rpc_request = orjson.loads(await request.body())
         except Exception as e:
             return {
                 "jsonrpc": "2.0",
@@ -288,102 +384,100 @@ def setup_mcp_server(app: FastAPI):
         return await process_mcp_request(method, params, request_id, user_uuid, user_id_str, app_uuid)
 
 
-async def process_mcp_request(method: str, params: dict, request_id: Any, user_uuid: str, user_id_str: str, app_uuid: str) -> dict:
-    """Process MCP request and return response"""
-    
-    if method == "initialize":
-        return {
-            "jsonrpc": "2.0",
-            "id": request_id,
-            "result": {
-                "protocolVersion": "2025-06-18",
-                "serverInfo": {
-                    "name": "openmemory-mcp-server",
-                    "version": "1.0.0"
-                },
-                "capabilities": {
-                    "tools": {}
-                }
-            }
-        }
-    
-    elif method == "tools/list":
-        return {
-            "jsonrpc": "2.0",
-            "id": request_id,
-            "result": {
-                "tools": [
-                    {
-                        "name": "add_memory",
-                        "description": "Store a memory to maintain continuity across conversations.",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "text": {
-                                    "type": "string",
-                                    "description": "What you want to remember"
-                                },
-                                "metadata": {
-                                    "type": "object",
-                                    "description": "Optional metadata to organize memories",
-                                    "properties": {
-                                        "category": {
-                                            "type": "string",
-                                            "description": "Primary category to organize this memory"
-                                        },
-                                        "tags": {
-                                            "type": "array",
-                                            "description": "Tags for flexible organization",
-                                            "items": {
-                                                "type": "string"
-                                            }
-                                        },
-                                        "priority": {
-                                            "type": "string",
-                                            "description": "Priority level for this memory"
-                                        }
-                                    }
-                                }
-                            },
-                            "required": ["text"]
-                        }
+# Static JSON-RPC results, built once at import; only the request id varies per call
+_INITIALIZE_RESULT = {
+    "protocolVersion": "2025-06-18",
+    "serverInfo": {
+        "name": "openmemory-mcp-server",
+        "version": "1.0.0"
+    },
+    "capabilities": {
+        "tools": {}
+    }
+}
+
+_TOOLS_LIST_RESULT = {
+    "tools": [
+        {
+            "name": "add_memory",
+            "description": "Store a memory to maintain continuity across conversations.",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "text": {
+                        "type": "string",
+                        "description": "What you want to remember"
                     },
-                    {
-                        "name": "search_memories",
-                        "description": "Search through stored memories using a query",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "query": {
-                                    "type": "string",
-                                    "description": "The search query"
-                                },
-                                "limit": {
-                                    "type": "integer",
-                                    "description": "Maximum number of results to return",
-                                    "default": 5
-                                }
+                    "metadata": {
+                        "type": "object",
+                        "description": "Optional metadata to organize memories",
+                        "properties": {
+                            "category": {
+                                "type": "string",
+                                "description": "Primary category to organize this memory"
                             },
-                            "required": ["query"]
-                        }
-                    },
-                    {
-                        "name": "list_memories",
-                        "description": "List all memories for the authenticated user",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "limit": {
-                                    "type": "integer",
-                                    "description": "Maximum number of memories to return",
-                                    "default": 10
+                            "tags": {
+                                "type": "array",
+                                "description": "Tags for flexible organization",
+                                "items": {
+                                    "type": "string"
                                 }
+                            },
+                            "priority": {
+                                "type": "string",
+                                "description": "Priority level for this memory"
                             }
                         }
                     }
-                ]
+                },
+                "required": ["text"]
+            }
+        },
+        {
+            "name": "search_memories",
+            "description": "Search through stored memories using a query",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "query": {
+                        "type": "string",
+                        "description": "The search query"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum number of results to return",
+                        "default": 5
+                    }
+                },
+                "required": ["query"]
+            }
+        },
+        {
+            "name": "list_memories",
+            "description": "List all memories for the authenticated user",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum number of memories to return",
+                        "default": 10
+                    }
+                }
             }
         }
+    ]
+}
+
+
+async def process_mcp_request(method: str, params: dict, request_id: Any, user_uuid: str, user_id_str: str, app_uuid: str) -> dict:
+    """Process MCP request and return response"""
+    
+    if method == "initialize":
+        return {"jsonrpc": "2.0", "id": request_id, "result": _INITIALIZE_RESULT}
+    
+    elif method == "tools/list":
+        return {"jsonrpc": "2.0", "id": request_id, "result": _TOOLS_LIST_RESULT}
     
     elif method == "tools/call":
         tool_name = params.get("name")
@@ -418,8 +512,7 @@ async def process_mcp_request(method: str, params: dict, request_id: Any, user_u
             }
             
         except Exception as e:
-            logger.error(f"Error handling tool call {tool_name}: {e}")
-            logger.error(traceback.format_exc())
+            logger.exception("Error handling tool call %s: %s", tool_name, e)
             return {
                 "jsonrpc": "2.0",
                 "id": request_id,
@@ -442,91 +535,161 @@ async def process_mcp_request(method: str, params: dict, request_id: Any, user_u
         }
 
 
-async def handle_add_memory(user_uuid: str, user_id_str: str, app_uuid: str, args: Dict[str, Any]) -> str:
-    """Handle add_memory tool call with metadata support (category, tags, priority)"""
-    text = args.get("text")
-    metadata = args.get("metadata", {})
-    
-    # Parse metadata if it's a JSON string
-    if isinstance(metadata, str):
-        try:
-            metadata = json.loads(metadata)
-        except json.JSONDecodeError:
-            logger.warning(f"Failed to parse metadata string: {metadata}")
-            metadata = {}
-    
-    logger.info(f"DEBUG: Received args: {args}")
-    logger.info(f"DEBUG: Extracted metadata: {metadata}")
-    
-    if not text:
-        return "Error: 'text' parameter is required"
-    
+# (metadata key, display label, optional value formatter) shown alongside memories
+_METADATA_FIELDS = (
+    ("category", "Category", None),
+    ("tags", "Tags", ", ".join),
+    ("priority", "Priority", None),
+)
+
+
+def _format_metadata_parts(metadata: Optional[Dict[str, Any]]) -> List[str]:
+    """Format category, tags, and priority from memory metadata for display"""
+    parts = []
+    if not metadata:
+        return parts
+    for key, label, fmt in _METADATA_FIELDS:
+        value = metadata.get(key)
+        if value:
+            parts.append(f"{label}: {fmt(value) if fmt else value}")
+    return parts
+
+
+def _insert_memory(user_uuid: str, app_uuid: str, text: str, metadata: Dict[str, Any]) -> Optional[Any]:
+    """Persist a memory row and return its ID, or None if the user is missing; runs in a worker thread"""
     db = SessionLocal()
     try:
         # Get user (should exist since we validated API key)
         user = db.query(User).filter_by(id=user_uuid).first()
         if not user:
-            return "Error: User not found"
+            return None
         
         # Create memory record with correct column names and UUID types
+        now = datetime.now(timezone.utc)
         memory = Memory(
             id=uuid4(),                    # Generate UUID for memory ID
             user_id=user_uuid,             # Use UUID foreign key
             app_id=app_uuid,               # Use UUID foreign key  
             content=text,                  # Use 'content' column, not 'memory'
             metadata_=metadata,            # Store metadata in the database
-            created_at=datetime.now(timezone.utc),
-            updated_at=datetime.now(timezone.utc),
+            created_at=now,
+            updated_at=now,
         )
         db.add(memory)
         db.commit()
         db.refresh(memory)
-        
-        # Try to add to vector store if available
-        try:
-            memory_client = get_memory_client()
-            if memory_client:
-                # Add to vector store using string user_id
-                vector_metadata = {
-                    "app_id": str(app_uuid),
-                    **metadata  # Include user-provided metadata in vector store
-                }
-                
-                memory_client.add(
-                    messages=[{"role": "user", "content": text}],
-                    user_id=user_id_str,  # Vector store expects string user_id
-                    metadata=vector_metadata,
-                )
-                logger.info(f"Added memory to vector store for user {user_id_str} with metadata: {metadata}")
-        except Exception as e:
-            logger.warning(f"Failed to add to vector store: {e}")
-            # Continue anyway - database entry was successful
-        
-        # Format response message
-        response_msg = f"Memory stored successfully. ID: {memory.id}"
-        
-        # Include category, tags, and priority in response if provided
-        if "category" in metadata and metadata["category"]:
-            response_msg += f"\nCategory: {metadata['category']}"
-        
-        if "tags" in metadata and metadata["tags"]:
-            tags_str = ", ".join(metadata["tags"])
-            response_msg += f"\nTags: {tags_str}"
-        
-        if "priority" in metadata and metadata["priority"]:
-            response_msg += f"\nPriority: {metadata['priority']}"
-        
-        return response_msg
+        return memory.id
         
     except Exception as e:
         db.rollback()
-        logger.error(f"Error adding memory: {e}")
-        logger.error(traceback.format_exc())
+        logger.exception("Error adding memory: %s", e)
         raise
     finally:
         db.close()
 
 
+def _search_memories_db(user_uuid: str, query: str, limit: int) -> List[Tuple[str, Optional[dict]]]:
+    """Full-text search over the user's memories as (content, metadata) rows; runs in a worker thread"""
+    db = SessionLocal()
+    try:
+        return db.query(Memory.content, Memory.metadata_).filter(
+            Memory.user_id == user_uuid,  # Use UUID for database query
+            # Matches the 'simple' config of the generated content_tsv column (GIN indexed)
+            Memory.content_tsv.bool_op("@@")(func.plainto_tsquery("simple", query))
+        ).limit(limit).all()
+    finally:
+        db.close()
+
+
+def _list_memories_db(user_uuid: str, limit: int) -> List[Tuple[str, datetime, Optional[dict]]]:
+    """Fetch the user's most recent memories as (content, created_at, metadata) rows; runs in a worker thread"""
+    db = SessionLocal()
+    try:
+        return db.query(Memory.content, Memory.created_at, Memory.metadata_).filter(
+            Memory.user_id == user_uuid  # Use UUID for database query
+        ).order_by(Memory.created_at.desc()).limit(limit).all()
+    finally:
+        db.close()
+
+
+def _add_to_vector_store(text: str, user_id_str: str, app_uuid: str, metadata: Dict[str, Any]) -> None:
+    """Add a stored memory to the vector store if available; runs on _vector_store_executor"""
+    try:
+        memory_client = get_memory_client()
+        if memory_client:
+            # Add to vector store using string user_id
+            vector_metadata = {
+                "app_id": str(app_uuid),
+                **metadata  # Include user-provided metadata in vector store
+            }
+            
+            memory_client.add(
+                messages=[{"role": "user", "content": text}],
+                user_id=user_id_str,  # Vector store expects string user_id
+                metadata=vector_metadata,
+            )
+            logger.info(f"Added memory to vector store for user {user_id_str} with metadata: {metadata}")
+    except Exception as e:
+        logger.warning(f"Failed to add to vector store: {e}")
+        # Continue anyway - database entry was successful
+
+
+def _search_vector_store(query: str, user_id_str: str, limit: int) -> Optional[List[Dict[str, Any]]]:
+    """Search the vector store, or return None if it is unavailable; runs in a worker thread"""
+    memory_client = get_memory_client()
+    if not memory_client:
+        return None
+    return memory_client.search(
+        query=query,
+        user_id=user_id_str,  # Vector store expects string user_id
+        limit=limit
+    )
+
+
+async def handle_add_memory(user_uuid: str, user_id_str: str, app_uuid: str, args: Dict[str, Any]) -> str:
+    """Handle add_memory tool call with metadata support (category, tags, priority)"""
+    text = args.get("text")
+    metadata = args.get("metadata", {})
+    
+    # Parse metadata if it's a JSON string
+    if isinstance(metadata, str):
+        try:
+            metadata = json.loads(metadata)
+        except json.JSONDecodeError:
+            logger.warning(f"Failed to parse metadata string: {metadata}")
+            metadata = {}
+    
+    # Only ever store an object so readers can use metadata_ as a dict
+    if not isinstance(metadata, dict):
+        metadata = {}
+    
+    logger.info(f"DEBUG: Received args: {args}")
+    logger.info(f"DEBUG: Extracted metadata: {metadata}")
+    
+    if not text:
+        return "Error: 'text' parameter is required"
+    
+    memory_id = await asyncio.to_thread(_insert_memory, user_uuid, app_uuid, text, metadata)
+    if memory_id is None:
+        return "Error: User not found"
+    
+    # Index in the vector store in the background; the database entry is the source of truth
+    task = asyncio.get_running_loop().run_in_executor(
+        _vector_store_executor, _add_to_vector_store, text, user_id_str, app_uuid, metadata
+    )
+    _vector_store_tasks.add(task)
+    task.add_done_callback(_vector_store_tasks.discard)
+    
+    # Format response message
+    response_msg = f"Memory stored successfully. ID: {memory_id}"
+    
+    # Include category, tags, and priority in response if provided
+    for part in _format_metadata_parts(metadata):
+        response_msg += f"\n{part}"
+    
+    return response_msg
+
+
 async def handle_search_memories(user_uuid: str, user_id_str: str, app_uuid: str, args: Dict[str, Any]) -> str:
     """Handle search_memories tool call"""
     query = args.get("query")
@@ -537,14 +700,8 @@ async def handle_search_memories(user_uuid: str, user_id_str: str, app_uuid: str
     
     try:
         # Try vector search first
-        memory_client = get_memory_client()
-        if memory_client:
-            results = memory_client.search(
-                query=query,
-                user_id=user_id_str,  # Vector store expects string user_id
-                limit=limit
-            )
-            
+        results = await asyncio.to_thread(_search_vector_store, query, user_id_str, limit)
+        if results is not None:
             if results:
                 formatted_results = []
                 for i, result in enumerate(results, 1):
@@ -556,13 +713,7 @@ async def handle_search_memories(user_uuid: str, user_id_str: str, app_uuid: str
                     result_str = f"{i}. {memory_text} (relevance: {score:.2f})"
                     
                     # Include category, tags, and priority if present
-                    metadata_parts = []
-                    if "category" in metadata and metadata["category"]:
-                        metadata_parts.append(f"Category: {metadata['category']}")
-                    if "tags" in metadata and metadata["tags"]:
-                        metadata_parts.append(f"Tags: {', '.join(metadata['tags'])}")
-                    if "priority" in metadata and metadata["priority"]:
-                        metadata_parts.append(f"Priority: {metadata['priority']}")
+                    metadata_parts = _format_metadata_parts(metadata)
                     
                     if metadata_parts:
                         result_str += f" [{' | '.join(metadata_parts)}]"
@@ -576,75 +727,43 @@ async def handle_search_memories(user_uuid: str, user_id_str: str, app_uuid: str
         logger.warning(f"Vector search failed: {e}")
     
     # Fallback to database search
-    db = SessionLocal()
-    try:
-        memories = db.query(Memory).filter(
-            Memory.user_id == user_uuid,           # Use UUID for database query
-            Memory.content.ilike(f"%{query}%")     # Use 'content' column
-        ).limit(limit).all()
-        
-        if memories:
-            formatted_results = []
-            for i, memory in enumerate(memories, 1):
-                result_str = f"{i}. {memory.content}"
-                
-                # Include category, tags, and priority from metadata if present
-                metadata = memory.metadata_ if isinstance(memory.metadata_, dict) else (json.loads(memory.metadata_) if memory.metadata_ else {})
-                metadata_parts = []
-                if metadata and "category" in metadata:
-                    metadata_parts.append(f"Category: {metadata['category']}")
-                if metadata and "tags" in metadata:
-                    metadata_parts.append(f"Tags: {', '.join(metadata['tags'])}")
-                if metadata and "priority" in metadata:
-                    metadata_parts.append(f"Priority: {metadata['priority']}")
-                
-                if metadata_parts:
-                    result_str += f" [{' | '.join(metadata_parts)}]"
-                
-                formatted_results.append(result_str)
+    memories = await asyncio.to_thread(_search_memories_db, user_uuid, query, limit)
+    if memories:
+        formatted_results = []
+        for i, (content, metadata) in enumerate(memories, 1):
+            result_str = f"{i}. {content}"
             
-            return f"Found {len(memories)} memories:\n" + "\n".join(formatted_results)
-        else:
-            return "No memories found matching your query."
+            # Include category, tags, and priority from metadata if present
+            metadata_parts = _format_metadata_parts(metadata)
             
-    finally:
-        db.close()
+            if metadata_parts:
+                result_str += f" [{' | '.join(metadata_parts)}]"
+            
+            formatted_results.append(result_str)
+        
+        return f"Found {len(memories)} memories:\n" + "\n".join(formatted_results)
+    else:
+        return "No memories found matching your query."
 
 
 async def handle_list_memories(user_uuid: str, user_id_str: str, app_uuid: str, args: Dict[str, Any]) -> str:
     """Handle list_memories tool call"""
     limit = args.get("limit", 10)
     
-    db = SessionLocal()
-    try:
-        memories = db.query(Memory).filter_by(
-            user_id=user_uuid  # Use UUID for database query
-        ).order_by(Memory.created_at.desc()).limit(limit).all()
-        
-        if not memories:
-            return "You have no stored memories yet."
+    memories = await asyncio.to_thread(_list_memories_db, user_uuid, limit)
+    if not memories:
+        return "You have no stored memories yet."
+    
+    formatted_results = []
+    for i, (content, created_at, metadata) in enumerate(memories, 1):
+        result_str = f"{i}. [{created_at.strftime('%Y-%m-%d %H:%M:%S')}] {content}"
         
-        formatted_results = []
-        for i, memory in enumerate(memories, 1):
-            created_at = memory.created_at.strftime("%Y-%m-%d %H:%M:%S")
-            result_str = f"{i}. [{created_at}] {memory.content}"
-            
-            # Include category, tags, and priority from metadata if present
-            metadata = memory.metadata_ if isinstance(memory.metadata_, dict) else (json.loads(memory.metadata_) if memory.metadata_ else {})
-            metadata_parts = []
-            if metadata and "category" in metadata:
-                metadata_parts.append(f"Category: {metadata['category']}")
-            if metadata and "tags" in metadata:
-                metadata_parts.append(f"Tags: {', '.join(metadata['tags'])}")
-            if metadata and "priority" in metadata:
-                metadata_parts.append(f"Priority: {metadata['priority']}")
-            
-            if metadata_parts:
-                result_str += f" [{' | '.join(metadata_parts)}]"
-            
-            formatted_results.append(result_str)
+        # Include category, tags, and priority from metadata if present
+        metadata_parts = _format_metadata_parts(metadata)
         
-        return f"Your {len(memories)} most recent memories:\n" + "\n".join(formatted_results)
+        if metadata_parts:
+            result_str += f" [{' | '.join(metadata_parts)}]"
         
-    finally:
-        db.close()
+        formatted_results.append(result_str)
+    
+    return f"Your {len(memories)} most recent memories:\n" + "\n".join(formatted_results)
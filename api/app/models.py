@@ -20,8 +20,8 @@ from sqlalchemy import (
     Boolean,
     UniqueConstraint,
 )
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy.orm import deferred, relationship
 
 from app.database import Base
 
@@ -105,6 +105,11 @@ class Memory(Base):
     user_id = Column(UUID, ForeignKey("users.id"), nullable=False, index=True)
     app_id = Column(UUID, ForeignKey("apps.id"), nullable=False, index=True)
     content = Column(String, nullable=False)
+    # Full-text search vector maintained by Postgres; deferred so regular loads skip it
+    content_tsv = deferred(Column(
+        TSVECTOR,
+        sa.Computed("to_tsvector('simple', content)", persisted=True),
+    ))
     vector = Column(String)
     metadata_ = Column('metadata', JSON, default=dict)
     state = Column(Enum(MemoryState), default=MemoryState.active, index=True)
@@ -123,6 +128,10 @@ class Memory(Base):
         Index('idx_memory_user_state', 'user_id', 'state'),
         Index('idx_memory_app_state', 'app_id', 'state'),
         Index('idx_memory_user_app', 'user_id', 'app_id'),
+        Index('idx_memory_user_created', 'user_id', created_at.desc()),
+        Index('idx_memory_content_tsv', 'content_tsv', postgresql_using='gin'),
+        # idx_memory_content_trgm (GIN, pg_trgm) is created by migration only,
+        # since create_all cannot assume the extension is installed
     )
 
 
@@ -1,39 +1,23 @@
-from typing import Any, Dict, Optional
-import json
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+import copy
+import hashlib
 import os
+import threading
 
 from app.database import get_db
 from app.models import Config as ConfigModel
 from app.utils.memory import reset_memory_client
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response
+import orjson
 from pydantic import BaseModel, Field
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import flag_modified
 
 router = APIRouter(prefix="/api/v1/config", tags=["config"])
 
-class UIFeatures(BaseModel):
-    enable_apps: bool = False
-
-class UIConfig(BaseModel):
-    features: UIFeatures
-
-@router.get("/ui", response_model=UIConfig)
-def get_ui_config():
-    """Get UI configuration"""
-    try:
-        config_path = os.path.join(os.path.dirname(__file__), '../../config.json')
-        with open(config_path, 'r') as f:
-            config = json.load(f)
-
-        ui_config = config.get('ui', {}).get('features', {})
-        return UIConfig(
-            features=UIFeatures(
-                enable_apps=ui_config.get('enable_apps', False)
-            )
-        )
-    except Exception:
-        return UIConfig(features=UIFeatures(enable_apps=False))
-
 class LLMConfig(BaseModel):
     model: str = Field(..., description="LLM model name")
     temperature: float = Field(..., description="Temperature setting for the model")
@@ -72,231 +56,365 @@ class ConfigSchema(BaseModel):
     mem0: Mem0Config
     ui: Optional[UIConfig] = None
 
-def get_default_configuration():
-    """Get the default configuration with sensible defaults for LLM and embedder."""
-    return {
-        "openmemory": {
-            "custom_instructions": None
-        },
-        "mem0": {
-            "llm": {
-                "provider": "openai",
-                "config": {
-                    "model": "gpt-4o-mini",
-                    "temperature": 0.1,
-                    "max_tokens": 2000,
-                    "api_key": "env:OPENAI_API_KEY"
-                }
-            },
-            "embedder": {
-                "provider": "openai",
-                "config": {
-                    "model": "text-embedding-3-small",
-                    "api_key": "env:OPENAI_API_KEY"
-                }
+def _section_etag(section: str, stamp: Any) -> str:
+    """Strong ETag for one config section as of stamp (updated_at or file mtime)."""
+    digest = hashlib.blake2b(f"{section}:{stamp}".encode(), digest_size=8).hexdigest()
+    return f'"{digest}"'
+
+def _not_modified(request: Request, response: Response, etag: Optional[str]) -> Optional[Response]:
+    """Return a 304 if the client already has etag, otherwise tag the outgoing response."""
+    if etag is None:
+        return None
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return None
+
+UI_CONFIG_PATH = os.path.join(os.path.dirname(__file__), '../../config.json')
+
+# (config.json mtime, parsed UIConfig), reused until the file changes
+_UI_CACHE: Optional[Tuple[float, UIConfig]] = None
+_UI_CACHE_LOCK = threading.Lock()
+
+@router.get("/ui", responses={200: {"model": UIConfig}})
+def get_ui_config(request: Request, response: Response):
+    """Get UI configuration"""
+    global _UI_CACHE
+    try:
+        mtime = os.stat(UI_CONFIG_PATH).st_mtime
+        cached = _UI_CACHE
+        if cached is None or cached[0] != mtime:
+            with _UI_CACHE_LOCK:
+                with open(UI_CONFIG_PATH, 'rb') as f:
+                    config = orjson.loads(f.read())
+
+                ui_config = config.get('ui', {}).get('features', {})
+                result = UIConfig(
+                    features=UIFeatures(
+                        enable_apps=ui_config.get('enable_apps', False)
+                    )
+                )
+                cached = _UI_CACHE = (mtime, result)
+
+        # Only a successfully parsed file gets an ETag; the fallback below must
+        # not be cached by clients
+        not_modified = _not_modified(request, response, _section_etag("ui", mtime))
+        if not_modified is not None:
+            return not_modified
+        return cached[1]
+    except Exception:
+        return UIConfig(features=UIFeatures(enable_apps=False))
+
+# Default configuration with sensible defaults for LLM and embedder, built once at import.
+# Never hand this dict out directly; callers get deep copies.
+_DEFAULT_CONFIG = {
+    "openmemory": {
+        "custom_instructions": None
+    },
+    "mem0": {
+        "llm": {
+            "provider": "openai",
+            "config": {
+                "model": "gpt-4o-mini",
+                "temperature": 0.1,
+                "max_tokens": 2000,
+                "api_key": "env:OPENAI_API_KEY"
             }
         },
-        "ui": {
-            "features": {
-                "enable_apps": True
+        "embedder": {
+            "provider": "openai",
+            "config": {
+                "model": "text-embedding-3-small",
+                "api_key": "env:OPENAI_API_KEY"
             }
         }
+    },
+    "ui": {
+        "features": {
+            "enable_apps": True
+        }
     }
+}
+
+# Sections every stored config must have, as (path, default) pairs
+_DEFAULT_PATHS = [
+    (("openmemory",), _DEFAULT_CONFIG["openmemory"]),
+    (("mem0", "llm"), _DEFAULT_CONFIG["mem0"]["llm"]),
+    (("mem0", "embedder"), _DEFAULT_CONFIG["mem0"]["embedder"]),
+    (("ui",), _DEFAULT_CONFIG["ui"]),
+]
+
+# Serialized once; /reset answers with these bytes instead of re-encoding the dict
+_DEFAULT_JSON_BYTES = orjson.dumps(_DEFAULT_CONFIG)
+
+def get_default_configuration():
+    """Get the default configuration with sensible defaults for LLM and embedder."""
+    return copy.deepcopy(_DEFAULT_CONFIG)
+
+# key -> (updated_at, merged config); validated against the row's updated_at on each read
+_CFG_CACHE: Dict[str, Tuple[datetime, Dict[str, Any]]] = {}
+_CFG_CACHE_LOCK = threading.Lock()
+
+def _cache_config(key: str, updated_at: Optional[datetime], value: Dict[str, Any]):
+    """Remember the merged config for key as of updated_at."""
+    if updated_at is None:
+        return
+    with _CFG_CACHE_LOCK:
+        _CFG_CACHE[key] = (updated_at, copy.deepcopy(value))
+
+def config_etag(section: str, updated_at: Optional[datetime]) -> Optional[str]:
+    """ETag for one section, derived from the row's updated_at (None if unknown)."""
+    if updated_at is None:
+        return None
+    return _section_etag(section, updated_at.isoformat())
+
+def get_config_section(db: Session, path: Tuple[str, ...], key: str = "main"):
+    """Get (updated_at, section) selecting only the JSON subpath at path.
+
+    Falls back to the full get_config_from_db read, which fills in defaults,
+    when the row or the section does not exist yet; updated_at is None then.
+    """
+    row = (
+        db.query(ConfigModel.updated_at, ConfigModel.value[path])
+        .filter(ConfigModel.key == key)
+        .first()
+    )
+    if row is not None and row[1] is not None:
+        return row[0], row[1]
+
+    section = get_config_from_db(db, key)
+    for part in path:
+        section = section.get(part) or {}
+    return None, section
 
 def get_config_from_db(db: Session, key: str = "main"):
     """Get configuration from database."""
-    config = db.query(ConfigModel).filter(ConfigModel.key == key).first()
+    # Cheap freshness check first; callers may mutate the result, so hand out a copy
+    row = db.query(ConfigModel.updated_at).filter(ConfigModel.key == key).first()
 
-    if not config:
-        # Create default config with proper provider configurations
+    if row is None:
+        # Create default config with proper provider configurations in a single
+        # statement; DO NOTHING covers a concurrent request creating it first
         default_config = get_default_configuration()
-        db_config = ConfigModel(key=key, value=default_config)
-        db.add(db_config)
+        stmt = pg_insert(ConfigModel).values(key=key, value=default_config)
+        stmt = stmt.on_conflict_do_nothing(
+            index_elements=[ConfigModel.key]
+        ).returning(ConfigModel.updated_at)
+        inserted = db.execute(stmt).first()
         db.commit()
-        db.refresh(db_config)
+        if inserted is None:
+            return get_config_from_db(db, key)
+        _cache_config(key, inserted.updated_at, default_config)
         return default_config
 
-    # Ensure the config has all required sections with defaults
-    config_value = config.value
-    default_config = get_default_configuration()
+    with _CFG_CACHE_LOCK:
+        cached = _CFG_CACHE.get(key)
+    if row.updated_at is not None and cached is not None and cached[0] == row.updated_at:
+        return copy.deepcopy(cached[1])
 
-    # Merge with defaults to ensure all required fields exist
-    if "openmemory" not in config_value:
-        config_value["openmemory"] = default_config["openmemory"]
-
-    if "mem0" not in config_value:
-        config_value["mem0"] = default_config["mem0"]
-    else:
-        # Ensure LLM config exists with defaults
-        if "llm" not in config_value["mem0"] or config_value["mem0"]["llm"] is None:
-            config_value["mem0"]["llm"] = default_config["mem0"]["llm"]
-
-        # Ensure embedder config exists with defaults
-        if "embedder" not in config_value["mem0"] or config_value["mem0"]["embedder"] is None:
-            config_value["mem0"]["embedder"] = default_config["mem0"]["embedder"]
-
-    if "ui" not in config_value:
-        config_value["ui"] = default_config["ui"]
+    config = db.query(ConfigModel).filter(ConfigModel.key == key).first()
 
-    # Save the updated config back to database if it was modified
-    if config_value != config.value:
-        config.value = config_value
+    # Ensure the config has all required sections with defaults
+    config_value = config.value
+    dirty = False
+
+    # Merge with defaults to ensure all required fields exist; only the
+    # missing sections are copied out of the shared template
+    for path, default in _DEFAULT_PATHS:
+        parent = config_value
+        for part in path[:-1]:
+            if not isinstance(parent.get(part), dict):
+                parent[part] = {}
+                dirty = True
+            parent = parent[part]
+        if parent.get(path[-1]) is None:
+            parent[path[-1]] = copy.deepcopy(default)
+            dirty = True
+
+    # Save the updated config back to database only if a default was filled in.
+    # The dict was mutated in place, so flag it for SQLAlchemy explicitly.
+    if dirty:
+        flag_modified(config, "value")
         db.commit()
-        db.refresh(config)
 
+    _cache_config(key, config.updated_at, config_value)
     return config_value
 
 def save_config_to_db(db: Session, config: Dict[str, Any], key: str = "main"):
     """Save configuration to database."""
-    db_config = db.query(ConfigModel).filter(ConfigModel.key == key).first()
-
-    if db_config:
-        db_config.value = config
-        db_config.updated_at = None  # Will trigger the onupdate to set current time
+    with _CFG_CACHE_LOCK:
+        _CFG_CACHE.pop(key, None)
+
+    # One round-trip whether or not the row exists; key is unique but not
+    # the primary key, so there is no identity-map lookup to lean on
+    stmt = pg_insert(ConfigModel).values(key=key, value=config)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ConfigModel.key],
+        set_={"value": stmt.excluded.value, "updated_at": stmt.excluded.updated_at},
+    ).returning(ConfigModel.value)
+    stored = db.execute(stmt).scalar()
+    db.commit()
+    return stored
+
+def _set_section(config: Dict[str, Any], path: Tuple[str, ...], value: Dict[str, Any], merge: bool):
+    """Set (or merge into) the section at path inside config, creating parents."""
+    parent = config
+    for part in path[:-1]:
+        if not isinstance(parent.get(part), dict):
+            parent[part] = {}
+        parent = parent[part]
+    if merge and isinstance(parent.get(path[-1]), dict):
+        parent[path[-1]].update(value)
     else:
-        db_config = ConfigModel(key=key, value=config)
-        db.add(db_config)
-
+        parent[path[-1]] = value
+    return parent[path[-1]]
+
+def patch_config_section(db: Session, path: Tuple[str, ...], value: Dict[str, Any],
+                         merge: bool = False, key: str = "main"):
+    """Write one config section and return it.
+
+    This is a single UPDATE ... RETURNING that rebuilds the JSON document
+    server-side; if the row does not exist yet it falls back to a
+    read-modify-write, which creates it.
+    """
+    with _CFG_CACHE_LOCK:
+        _CFG_CACHE.pop(key, None)
+
+    empty = sa.cast(sa.literal("{}"), JSONB)
+    doc = sa.cast(ConfigModel.value, JSONB)
+
+    def as_object(expr):
+        # Missing or non-object nodes are replaced, as in _set_section;
+        # jsonb || on a scalar or array would build an array instead
+        return sa.case((sa.func.jsonb_typeof(expr) == "object", expr), else_=empty)
+
+    section = sa.bindparam(None, value, type_=JSONB)
+    if merge:
+        section = as_object(doc[path]).op("||")(section)
+    # Wrap the section back up to the root: parent || {part: child}
+    for depth in range(len(path) - 1, -1, -1):
+        parent = doc[path[:depth]] if depth else doc
+        section = as_object(parent).op("||")(
+            sa.func.jsonb_build_object(path[depth], section)
+        )
+    stmt = (
+        sa.update(ConfigModel)
+        .where(ConfigModel.key == key)
+        .values(value=sa.cast(section, ConfigModel.value.type))
+        .returning(ConfigModel.value)
+    )
+    stored = db.execute(stmt).scalar()
     db.commit()
-    db.refresh(db_config)
-    return db_config.value
+    if stored is not None:
+        for part in path:
+            stored = stored[part]
+        return stored
 
-@router.get("/", response_model=ConfigSchema)
+    current_config = get_config_from_db(db, key)
+    updated = _set_section(current_config, path, value, merge)
+    save_config_to_db(db, current_config, key)
+    return updated
+
+@router.get("/", responses={200: {"model": ConfigSchema}})
 async def get_configuration(db: Session = Depends(get_db)):
     """Get the current configuration."""
     config = get_config_from_db(db)
     return config
 
-@router.put("/", response_model=ConfigSchema)
-async def update_configuration(config: ConfigSchema, db: Session = Depends(get_db)):
+@router.put("/", responses={200: {"model": ConfigSchema}})
+async def update_configuration(config: ConfigSchema, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """Update the configuration."""
+    # get_config_from_db hands out a fresh dict, so it can be updated in place
     current_config = get_config_from_db(db)
 
-    # Convert to dict for processing
-    updated_config = current_config.copy()
-
     # Update openmemory settings if provided
     if config.openmemory is not None:
-        if "openmemory" not in updated_config:
-            updated_config["openmemory"] = {}
-        updated_config["openmemory"].update(config.openmemory.dict(exclude_none=True))
+        if "openmemory" not in current_config:
+            current_config["openmemory"] = {}
+        current_config["openmemory"].update(config.openmemory.model_dump(exclude_none=True))
 
-    # Update mem0 settings
-    updated_config["mem0"] = config.mem0.dict(exclude_none=True)
+    # Update mem0 settings; unset optional fields must stay absent rather than
+    # null (e.g. _fix_ollama_urls only defaults a *missing* ollama_base_url)
+    current_config["mem0"] = config.mem0.model_dump(exclude_none=True)
 
     # Save the configuration to database
-    save_config_to_db(db, updated_config)
-    reset_memory_client()
-    return updated_config
+    save_config_to_db(db, current_config)
+    background_tasks.add_task(reset_memory_client)
+    return current_config
 
-@router.post("/reset", response_model=ConfigSchema)
-async def reset_configuration(db: Session = Depends(get_db)):
+@router.post("/reset", responses={200: {"model": ConfigSchema}})
+async def reset_configuration(background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """Reset the configuration to default values."""
     try:
-        # Get the default configuration with proper provider setups
-        default_config = get_default_configuration()
-
-        # Save it as the current configuration in the database
-        save_config_to_db(db, default_config)
-        reset_memory_client()
-        return default_config
+        # Save a copy of the defaults as the current configuration; the
+        # response body is the precomputed serialization of the same dict
+        save_config_to_db(db, get_default_configuration())
+        background_tasks.add_task(reset_memory_client)
+        return Response(content=_DEFAULT_JSON_BYTES, media_type="application/json")
     except Exception as e:
         raise HTTPException(
             status_code=500, 
             detail=f"Failed to reset configuration: {str(e)}"
         )
 
-@router.get("/mem0/llm", response_model=LLMProvider)
-async def get_llm_configuration(db: Session = Depends(get_db)):
+@router.get("/mem0/llm", responses={200: {"model": LLMProvider}})
+async def get_llm_configuration(request: Request, response: Response, db: Session = Depends(get_db)):
     """Get only the LLM configuration."""
-    config = get_config_from_db(db)
-    llm_config = config.get("mem0", {}).get("llm", {})
+    updated_at, llm_config = get_config_section(db, ("mem0", "llm"))
+    not_modified = _not_modified(request, response, config_etag("mem0.llm", updated_at))
+    if not_modified is not None:
+        return not_modified
     return llm_config
 
-@router.put("/mem0/llm", response_model=LLMProvider)
-async def update_llm_configuration(llm_config: LLMProvider, db: Session = Depends(get_db)):
+@router.put("/mem0/llm", responses={200: {"model": LLMProvider}})
+async def update_llm_configuration(llm_config: LLMProvider, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """Update only the LLM configuration."""
-    current_config = get_config_from_db(db)
-
-    # Ensure mem0 key exists
-    if "mem0" not in current_config:
-        current_config["mem0"] = {}
-
-    # Update the LLM configuration
-    current_config["mem0"]["llm"] = llm_config.dict(exclude_none=True)
+    updated = patch_config_section(db, ("mem0", "llm"), llm_config.model_dump(exclude_none=True))
+    background_tasks.add_task(reset_memory_client)
+    return updated
 
-    # Save the configuration to database
-    save_config_to_db(db, current_config)
-    reset_memory_client()
-    return current_config["mem0"]["llm"]
-
-@router.get("/mem0/embedder", response_model=EmbedderProvider)
-async def get_embedder_configuration(db: Session = Depends(get_db)):
+@router.get("/mem0/embedder", responses={200: {"model": EmbedderProvider}})
+async def get_embedder_configuration(request: Request, response: Response, db: Session = Depends(get_db)):
     """Get only the Embedder configuration."""
-    config = get_config_from_db(db)
-    embedder_config = config.get("mem0", {}).get("embedder", {})
+    updated_at, embedder_config = get_config_section(db, ("mem0", "embedder"))
+    not_modified = _not_modified(request, response, config_etag("mem0.embedder", updated_at))
+    if not_modified is not None:
+        return not_modified
     return embedder_config
 
-@router.put("/mem0/embedder", response_model=EmbedderProvider)
-async def update_embedder_configuration(embedder_config: EmbedderProvider, db: Session = Depends(get_db)):
+@router.put("/mem0/embedder", responses={200: {"model": EmbedderProvider}})
+async def update_embedder_configuration(embedder_config: EmbedderProvider, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """Update only the Embedder configuration."""
-    current_config = get_config_from_db(db)
-
-    # Ensure mem0 key exists
-    if "mem0" not in current_config:
-        current_config["mem0"] = {}
-
-    # Update the Embedder configuration
-    current_config["mem0"]["embedder"] = embedder_config.dict(exclude_none=True)
-
-    # Save the configuration to database
-    save_config_to_db(db, current_config)
-    reset_memory_client()
-    return current_config["mem0"]["embedder"]
+    updated = patch_config_section(db, ("mem0", "embedder"), embedder_config.model_dump(exclude_none=True))
+    background_tasks.add_task(reset_memory_client)
+    return updated
 
-@router.get("/openmemory", response_model=OpenMemoryConfig)
-async def get_openmemory_configuration(db: Session = Depends(get_db)):
+@router.get("/openmemory", responses={200: {"model": OpenMemoryConfig}})
+async def get_openmemory_configuration(request: Request, response: Response, db: Session = Depends(get_db)):
     """Get only the OpenMemory configuration."""
-    config = get_config_from_db(db)
-    openmemory_config = config.get("openmemory", {})
+    updated_at, openmemory_config = get_config_section(db, ("openmemory",))
+    not_modified = _not_modified(request, response, config_etag("openmemory", updated_at))
+    if not_modified is not None:
+        return not_modified
     return openmemory_config
 
-@router.put("/openmemory", response_model=OpenMemoryConfig)
-async def update_openmemory_configuration(openmemory_config: OpenMemoryConfig, db: Session = Depends(get_db)):
+@router.put("/openmemory", responses={200: {"model": OpenMemoryConfig}})
+async def update_openmemory_configuration(openmemory_config: OpenMemoryConfig, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """Update only the OpenMemory configuration."""
-    current_config = get_config_from_db(db)
-
-    # Ensure openmemory key exists
-    if "openmemory" not in current_config:
-        current_config["openmemory"] = {}
-
-    # Update the OpenMemory configuration
-    current_config["openmemory"].update(openmemory_config.dict(exclude_none=True))
+    updated = patch_config_section(
+        db, ("openmemory",), openmemory_config.model_dump(exclude_none=True), merge=True
+    )
+    background_tasks.add_task(reset_memory_client)
+    return updated
 
-    # Save the configuration to database
-    save_config_to_db(db, current_config)
-    reset_memory_client()
-    return current_config["openmemory"]
-
-@router.get("/ui", response_model=UIConfig)
+@router.get("/ui", responses={200: {"model": UIConfig}})
 async def get_ui_configuration(db: Session = Depends(get_db)):
     """Get only the UI configuration."""
     config = get_config_from_db(db)
     ui_config = config.get("ui", {"features": {"enable_apps": True}})
     return ui_config
 
-@router.put("/ui", response_model=UIConfig)
+@router.put("/ui", responses={200: {"model": UIConfig}})
 async def update_ui_configuration(ui_config: UIConfig, db: Session = Depends(get_db)):
     """Update only the UI configuration."""
-    current_config = get_config_from_db(db)
-
-    # Ensure ui key exists
-    if "ui" not in current_config:
-        current_config["ui"] = {"features": {"enable_apps": True}}
-
-    # Update the UI configuration
-    current_config["ui"].update(ui_config.dict(exclude_none=True))
-
-    # Save the configuration to database
-    save_config_to_db(db, current_config)
-    return current_config["ui"]
+    return patch_config_section(db, ("ui",), ui_config.model_dump(exclude_none=True), merge=True)
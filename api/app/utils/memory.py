@@ -31,6 +31,7 @@ import hashlib
 import json
 import os
 import socket
+import threading
 
 from app.database import SessionLocal
 from app.models import Config as ConfigModel
@@ -39,6 +40,7 @@ from mem0 import Memory
 
 _memory_client = None
 _config_hash = None
+_client_lock = threading.Lock()
 
 
 def _get_config_hash(config_dict):
@@ -129,8 +131,11 @@ def _fix_ollama_urls(config_section):
 def reset_memory_client():
     """Reset the global memory client to force reinitialization with new config."""
     global _memory_client, _config_hash
-    _memory_client = None
-    _config_hash = None
+    # Same lock as the setup in get_memory_client, so a reset from a request
+    # background task waits for an in-flight build instead of being overwritten by it
+    with _client_lock:
+        _memory_client = None
+        _config_hash = None
 
 
 def get_default_memory_config():
@@ -267,21 +272,27 @@ def get_memory_client(custom_instructions: str = None):
         current_config_hash = _get_config_hash(config)
         
         # Only reinitialize if config changed or client doesn't exist
-        if _memory_client is None or _config_hash != current_config_hash:
-            print(f"Initializing memory client with config hash: {current_config_hash}")
-            try:
-                _memory_client = Memory.from_config(config_dict=config)
-                print(f"Memory client API version: {_memory_client.api_version}")
-                _config_hash = current_config_hash
-                print("Memory client initialized successfully")
-            except Exception as init_error:
-                print(f"Warning: Failed to initialize memory client: {init_error}")
-                print("Server will continue running with limited memory functionality")
-                _memory_client = None
-                _config_hash = None
-                return None
-        
-        return _memory_client
+        if _memory_client is not None and _config_hash == current_config_hash:
+            return _memory_client
+
+        # Callers run in several worker threads at once; re-check under the lock
+        # so concurrent callers don't each run Memory.from_config
+        with _client_lock:
+            if _memory_client is None or _config_hash != current_config_hash:
+                print(f"Initializing memory client with config hash: {current_config_hash}")
+                try:
+                    _memory_client = Memory.from_config(config_dict=config)
+                    print(f"Memory client API version: {_memory_client.api_version}")
+                    _config_hash = current_config_hash
+                    print("Memory client initialized successfully")
+                except Exception as init_error:
+                    print(f"Warning: Failed to initialize memory client: {init_error}")
+                    print("Server will continue running with limited memory functionality")
+                    _memory_client = None
+                    _config_hash = None
+                    return None
+
+            return _memory_client
         
     except Exception as e:
         print(f"Warning: Exception occurred while initializing memory client: {e}")
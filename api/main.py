@@ -11,12 +11,14 @@ from app.routers.auth import router as auth_router
 from app.routers.users import router as users_router
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi_pagination import add_pagination
 
 app = FastAPI(
     title="OpenMemory API",
     description="Multi-user collaborative memory system",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=ORJSONResponse
 )
 
 app.add_middleware(
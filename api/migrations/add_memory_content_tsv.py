@@ -0,0 +1,43 @@
+# api/migrations/add_memory_content_tsv.py
+"""
+Migration script to add the full-text search column to the memories table
+Run this script to migrate existing databases; it is safe to run repeatedly
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from app.config import DATABASE_URL
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def migrate_database():
+    """Add memories.content_tsv and its GIN index if they are missing"""
+
+    engine = create_engine(DATABASE_URL)
+
+    # create_all() only creates missing tables, so databases created before the
+    # column existed never get it; the MCP search fallback queries it directly
+    with engine.begin() as conn:
+        logger.info("Adding memories.content_tsv...")
+        conn.execute(text(
+            "ALTER TABLE memories ADD COLUMN IF NOT EXISTS content_tsv tsvector "
+            "GENERATED ALWAYS AS (to_tsvector('simple', content)) STORED"
+        ))
+
+        logger.info("Creating idx_memory_content_tsv...")
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_memory_content_tsv "
+            "ON memories USING gin (content_tsv)"
+        ))
+
+
+if __name__ == "__main__":
+    logger.info("Starting database migration...")
+    migrate_database()
+    logger.info("Migration complete!")